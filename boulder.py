@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING
 # Normal imports
 from designer import *
 from random import randint
-from scale import Scale
+from bisect import insort
+from scale import Scale, BACKGROUND_HEIGHT
 from useful import boulder_speed
 
 if TYPE_CHECKING:
@@ -23,6 +24,7 @@ class Boulder:
     scale: Scale
     boulder: DesignerObject
     value: float = BOULDER_BASE_POINTS
+    scale_lag: float = 0  # How far the boulder has moved without its scale
     
     def __init__(self, world: World):
         """
@@ -50,6 +52,7 @@ class Boulder:
         else:
             self.boulder.alpha = .5
             world.boulders[self.boulder.x] = self
+            insort(world.sorted_keys, self.boulder.x)
             if len(world.boulders) == 1:
                 world.selected = self.boulder.x
                 self.boulder.alpha = 1
@@ -91,6 +94,7 @@ class Boulder:
         self.scale.remove()
         x = self.boulder.x
         del world.boulders[self.boulder.x]
+        world.sorted_keys.remove(x)
         destroy(self.boulder)
         if x == world.selected:
             world.select_lowest()
@@ -98,7 +102,13 @@ class Boulder:
     def move_down(self, world: World):
         """
         Moves the boulder down by BOULDER_SPEED.  This happens every frame.
+        While the scale is still above the window, it is left where it is, and
+            catches up with the boulder once it would come into view.
         """
         speed = boulder_speed(world.score, BOULDER_BASE_SPEED)
         self.boulder.y += speed
-        self.scale.move_down(speed)
+        self.scale_lag += speed
+        if self.boulder.y < -BACKGROUND_HEIGHT:
+            return
+        self.scale.move_down(self.scale_lag)
+        self.scale_lag = 0
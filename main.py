@@ -1,6 +1,6 @@
 from designer import *
 from designer import __version__ as DESIGNER_VERSION
-from useful import ensure_version, Menu, MenuEntry
+from useful import ensure_version, Menu, MenuEntry, DEBUG_KEYS
 
 MIN_DESIGNER_VERSION = "0.6.3"
 
@@ -22,7 +22,7 @@ def void_keyPressed(menu: Menu, key: str):
         match key:
             case "escape":
                 stop()
-            case _:
+            case _ if DEBUG_KEYS:
                 print(key)
 
 
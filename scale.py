@@ -10,7 +10,7 @@ from designer import *
 from useful import int_from_pattern, ensure_octave, get_next_letter, \
     pm_bool, cmp, GAME_FONT_NAME, GAME_FONT_PATH
 from dataclasses import dataclass, field
-from useful import choice
+from random import randrange
 
 # I might change these to better symbols at some point.
 SHARP = '#'
@@ -37,139 +37,40 @@ ACCIDENTALS_START = {
     FLAT: FLATS_START
 }
 
-
-@dataclass
-class ScaleInfo:
-    name: str  # The name of the type of scale
-    pattern: str  # The pattern of whole and half (and augmented) steps
-    # The notes that this type of scale can start without octaves
-    possible_starts_octaveless: [str]
-    # All of the possible start positions
-    possible_starts: set[str] = field(default_factory=set)
-    
-    def __post_init__(self):
-        """ Creates possible_starts from possible_starts_octaveless """
-        for possible_start in self.possible_starts_octaveless:
-            for octave in range(9):
-                self.possible_starts.add(possible_start + str(octave))
-
-
-# A dictionary to store some info about the types of scale, indexed with the
-# key that must be pressed to choose the type of scale
-SCALE_TYPE_INFO = {
-    "q": ScaleInfo("Major",          "WWHWWWH", [
-        "Cb", "Gb", "Db", "Ab", "Eb", "Bb", "F",
-        "C", "G", "D", "A", "E", "B", "F#", "C#"
-    ]),
-    "w": ScaleInfo("Natural Minor",  "WHWWHWW", [
-        "Ab", "Eb", "Bb", "F", "C", "G", "D",
-        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
-    ]),
-    "e": ScaleInfo("Harmonic Minor", "WHWWH3H", [
-        "Ab", "Eb", "Bb", "F", "C", "G", "D",
-        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
-    ]),
-    "r": ScaleInfo("Melodic Minor",  "WHWWWWH", [
-        "Ab", "Eb", "Bb", "F", "C", "G", "D",
-        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
-    ]),
-    "1": ScaleInfo("Ionian",         "WWHWWWH", [
-        "Cb", "Gb", "Db", "Ab", "Eb", "Bb", "F",
-        "C", "G", "D", "A", "E", "B", "F#", "C#"
-    ]),
-    "2": ScaleInfo("Dorian",         "WHWWWHW", [
-        "Db", "Ab", "Eb", "Bb", "F", "C", "G",
-        "D", "A", "E", "B", "F#", "C#", "G#", "D#"
-    ]),
-    "3": ScaleInfo("Phrygian",       "HWWWHWW", [
-        "Eb", "Bb", "F", "C", "G", "D", "A",
-        "E", "B", "F#", "C#", "G#", "D#", "A#", "E#"
-    ]),
-    "4": ScaleInfo("Lydian",         "WWWHWWH", [
-        "Fb", "Cb", "Gb", "Db", "Ab", "Eb", "Bb",
-        "F", "C", "G", "D", "A", "E", "B", "F#"
-    ]),
-    "5": ScaleInfo("Mixolydian",     "WWHWWHW", [
-        "Gb", "Db", "Ab", "Eb", "Bb", "F", "C",
-        "G", "D", "A", "E", "B", "F#", "C#", "G#"
-    ]),
-    "6": ScaleInfo("Aeolian",        "WHWWHWW", [
-        "Ab", "Eb", "Bb", "F", "C", "G", "D",
-        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
-    ]),
-    "7": ScaleInfo("Lochrian",       "HWWHWWW", [
-        "Bb", "F", "C", "G", "D", "A", "E",
-        "B", "F#", "C#", "G#", "D#", "A#", "E#", "B#"
-    ])
+# The accidentals for up to three sharps (positive) or flats (negative), and the
+# number of sharps or flats for each of those accidentals
+ACCIDENTALS = {n: SHARP*n + FLAT*-n for n in range(-3, 4)}
+SHARPS_FLATS = {accidental: n for n, accidental in ACCIDENTALS.items()}
+
+# The letter, accidentals, and octave of every note name that the game can come
+# up with, so that most Notes don't need to be parsed character by character
+PARSED_NOTES = {
+    f"{letter}{accidental}{octave}": (letter, accidental, octave)
+    for letter in "ABCDEFG"
+    for accidental in ACCIDENTALS.values()
+    for octave in range(10)
 }
 
-# A dictionary to store the mapping of the names of scale types to the key that
-# must be pressed to choose the type of scale
-SCALE_TYPE_KEYS = {
-    scale_info.name: key for key, scale_info in SCALE_TYPE_INFO.items()
-}
-
-NORMAL_SCALE_KEYS = ['q', 'w', 'e', 'r']
-CHURCH_MODES_KEYS = [f"{i}" for i in range(1, LETTERS_PER_OCTAVE + 1)]
-
-NORMAL_SCALE_NAMES = [SCALE_TYPE_INFO[key].name for key in NORMAL_SCALE_KEYS]
-CHURCH_MODES_NAMES = [SCALE_TYPE_INFO[i].name for i in CHURCH_MODES_KEYS]
-
-
-@dataclass
-class Clef:
-    name: str
-    symbol: str
-    lowest_note: Note  # Note number 1, not 0
-    sharps_pattern: [bool]  # True: up   a 5th, False: down a 4th
-    flats_pattern:  [bool]  # True: down a 5th, False: up   a 4th
-    
-    def all_notes(self, world: World) -> set:
-        """
-            Creates a set of all possible starting notes from lowest_note
-            
-            Args:
-                world (World): The world from which to get settings
-            
-            Returns:
-                set: The set of all possible starting notes for this clef, given
-                    the number of ledger lines as defined in `world.settings`
-        """
-        all_notes = []
-        letter_now = self.lowest_note.letter
-        octave_now = self.lowest_note.octave
-        for i in range(TOTAL_NOTES - LETTERS_PER_OCTAVE):
-            temp_notes = [letter_now] * 3
-            temp_notes[0] += FLAT
-            temp_notes[2] += SHARP
-            temp_notes = [f"{note}{octave_now}" for note in temp_notes]
-            all_notes += temp_notes
-            
-            letter_now = get_next_letter(letter_now)
-            if letter_now == "C":
-                octave_now += 1
-                
-        return set(
-            all_notes[
-                3 * (LEDGER_LINES - world.settings.max_low_ledger_positions):
-                len(all_notes) -
-                3 * (LEDGER_LINES - world.settings.max_high_ledger_positions)
-            ]
-        )
-
 
 class KeySignature:
+    __slots__ = ('sharps_flats', 'letters')
     sharps_flats: int
+    letters: frozenset[str]  # The letters that the key signature affects
     
     def __init__(self, sharps_flats: int = 0):
         """
-        Constructor for KeySignature.  Just assigns the input to the field.
+        Constructor for KeySignature.  Assigns the input to the field, and works
+            out which letters are sharp or flat in the key signature.
 
         Args:
             sharps_flats (int): The number of sharps or flats in the key
                 signature.  Positive for sharps, negative for flats.
         """
         self.sharps_flats = sharps_flats
+        if self.sharps_flats < 0:
+            self.letters = frozenset(ORDER_OF_SHARPS[self.sharps_flats:])
+        else:
+            self.letters = frozenset(ORDER_OF_SHARPS[:self.sharps_flats])
     
     def __contains__(self, note: Note) -> bool:
         """
@@ -181,9 +82,7 @@ class KeySignature:
         Returns:
             bool: Whether the letter of note is in the key signature.
         """
-        if self.sharps_flats < 0:
-            return note.letter in ORDER_OF_SHARPS[self.sharps_flats:]
-        return note.letter in ORDER_OF_SHARPS[:self.sharps_flats]
+        return note.letter in self.letters
     
     def __rxor__(self, note: Note) -> bool:
         """
@@ -207,9 +106,18 @@ class KeySignature:
         return -cmp(f"{note.sharp_flat}A", "A") != cmp(self.sharps_flats, 0)
 
 
+# Every possible key signature, indexed by its number of sharps (or flats, if
+# negative), so they can be reused rather than made again
+KEY_SIGNATURES = {
+    i: KeySignature(i)
+    for i in range(-LETTERS_PER_OCTAVE, LETTERS_PER_OCTAVE + 1)
+}
+
+
 class Note:
+    __slots__ = ('letter', 'sharp_flat', 'octave')
     letter: str
-    sharp_flat: str = ''
+    sharp_flat: str
     octave: int
     
     def __init__(self, note: str):
@@ -221,6 +129,10 @@ class Note:
         Args:
             note (str): The string representation to be converted.
         """
+        if note in PARSED_NOTES:
+            self.letter, self.sharp_flat, self.octave = PARSED_NOTES[note]
+            return
+        
         if ord('A') <= ord(note[0]) <= ord('G'):
             self.letter = note[0]
         else:
@@ -259,6 +171,22 @@ class Note:
             clef (Clef): The clef that the note will be displayed in, so we know
                 how high on the staff it needs to be.
 
+        Returns:
+            int: How high on the staff the note needs to be, given the clef.
+        """
+        position = (clef.name, self.letter, self.octave)
+        if position in FONT_OFFSET_NUMBERS:
+            return FONT_OFFSET_NUMBERS[position]
+        return self.calculate_font_offset_number(clef)
+    
+    def calculate_font_offset_number(self, clef: Clef) -> int:
+        """
+        Works out what font_offset_number returns, for when it isn't already
+            in FONT_OFFSET_NUMBERS.
+        
+        Args:
+            clef (Clef): The clef that the note will be displayed in
+        
         Returns:
             int: How high on the staff the note needs to be, given the clef.
         """
@@ -296,7 +224,7 @@ class Note:
     
     def string_form(self,
                     clef: Clef = None,
-                    key_signature: KeySignature = KeySignature(),
+                    key_signature: KeySignature = KEY_SIGNATURES[0],
                     octave: bool = False
                     ) -> str:
         """
@@ -339,8 +267,8 @@ class Note:
         Returns:
             int: said number
         """
-        if not self.sharp_flat:
-            return 0
+        if self.sharp_flat in SHARPS_FLATS:
+            return SHARPS_FLATS[self.sharp_flat]
         return len(self.sharp_flat) * pm_bool(self.sharp_flat[0] == SHARP)
     
     def up_by(self, half_steps: int, scale_length: int) -> Note:
@@ -379,8 +307,189 @@ class Note:
             case _:
                 pass
         
-        temp_sharp_flat = SHARP*temp_sharp_flat_num + FLAT*-temp_sharp_flat_num
-        return Note(f"{temp_letter}{temp_sharp_flat}{temp_octave}")
+        # The parts are already known, so skip building and parsing a string
+        next_note = object.__new__(Note)
+        next_note.letter = temp_letter
+        if temp_sharp_flat_num in ACCIDENTALS:
+            next_note.sharp_flat = ACCIDENTALS[temp_sharp_flat_num]
+        else:
+            next_note.sharp_flat = \
+                SHARP*temp_sharp_flat_num + FLAT*-temp_sharp_flat_num
+        next_note.octave = temp_octave
+        return next_note
+
+
+@dataclass(slots=True)
+class ScaleInfo:
+    name: str  # The name of the type of scale
+    pattern: str  # The pattern of whole and half (and augmented) steps
+    # The notes that this type of scale can start without octaves
+    possible_starts_octaveless: [str]
+    # All of the possible start positions
+    possible_starts: set[str] = field(default_factory=set)
+    # The pattern, converted to numbers of half steps, one byte per step
+    pattern_ints: bytes = b""
+    # The Notes for each of possible_starts, indexed by their names
+    start_notes: dict[str, Note] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        """
+        Creates possible_starts from possible_starts_octaveless, pattern_ints
+            from pattern, and start_notes from possible_starts
+        """
+        self.pattern_ints = bytes(int_from_pattern(c) for c in self.pattern)
+        for possible_start in self.possible_starts_octaveless:
+            for octave in range(9):
+                self.possible_starts.add(possible_start + str(octave))
+        self.start_notes = {
+            start: Note(start) for start in self.possible_starts
+        }
+
+
+# A dictionary to store some info about the types of scale, indexed with the
+# key that must be pressed to choose the type of scale
+SCALE_TYPE_INFO = {
+    "q": ScaleInfo("Major",          "WWHWWWH", [
+        "Cb", "Gb", "Db", "Ab", "Eb", "Bb", "F",
+        "C", "G", "D", "A", "E", "B", "F#", "C#"
+    ]),
+    "w": ScaleInfo("Natural Minor",  "WHWWHWW", [
+        "Ab", "Eb", "Bb", "F", "C", "G", "D",
+        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
+    ]),
+    "e": ScaleInfo("Harmonic Minor", "WHWWH3H", [
+        "Ab", "Eb", "Bb", "F", "C", "G", "D",
+        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
+    ]),
+    "r": ScaleInfo("Melodic Minor",  "WHWWWWH", [
+        "Ab", "Eb", "Bb", "F", "C", "G", "D",
+        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
+    ]),
+    "1": ScaleInfo("Ionian",         "WWHWWWH", [
+        "Cb", "Gb", "Db", "Ab", "Eb", "Bb", "F",
+        "C", "G", "D", "A", "E", "B", "F#", "C#"
+    ]),
+    "2": ScaleInfo("Dorian",         "WHWWWHW", [
+        "Db", "Ab", "Eb", "Bb", "F", "C", "G",
+        "D", "A", "E", "B", "F#", "C#", "G#", "D#"
+    ]),
+    "3": ScaleInfo("Phrygian",       "HWWWHWW", [
+        "Eb", "Bb", "F", "C", "G", "D", "A",
+        "E", "B", "F#", "C#", "G#", "D#", "A#", "E#"
+    ]),
+    "4": ScaleInfo("Lydian",         "WWWHWWH", [
+        "Fb", "Cb", "Gb", "Db", "Ab", "Eb", "Bb",
+        "F", "C", "G", "D", "A", "E", "B", "F#"
+    ]),
+    "5": ScaleInfo("Mixolydian",     "WWHWWHW", [
+        "Gb", "Db", "Ab", "Eb", "Bb", "F", "C",
+        "G", "D", "A", "E", "B", "F#", "C#", "G#"
+    ]),
+    "6": ScaleInfo("Aeolian",        "WHWWHWW", [
+        "Ab", "Eb", "Bb", "F", "C", "G", "D",
+        "A", "E", "B", "F#", "C#", "G#", "D#", "A#"
+    ]),
+    "7": ScaleInfo("Lochrian",       "HWWHWWW", [
+        "Bb", "F", "C", "G", "D", "A", "E",
+        "B", "F#", "C#", "G#", "D#", "A#", "E#", "B#"
+    ])
+}
+
+# A dictionary to store the mapping of the names of scale types to the key that
+# must be pressed to choose the type of scale
+SCALE_TYPE_KEYS = {
+    scale_info.name: key for key, scale_info in SCALE_TYPE_INFO.items()
+}
+
+NORMAL_SCALE_KEYS = ['q', 'w', 'e', 'r']
+CHURCH_MODES_KEYS = [f"{i}" for i in range(1, LETTERS_PER_OCTAVE + 1)]
+
+NORMAL_SCALE_NAMES = [SCALE_TYPE_INFO[key].name for key in NORMAL_SCALE_KEYS]
+CHURCH_MODES_NAMES = [SCALE_TYPE_INFO[i].name for i in CHURCH_MODES_KEYS]
+
+
+@dataclass(slots=True)
+class Clef:
+    name: str
+    symbol: str
+    lowest_note: Note  # Note number 1, not 0
+    sharps_pattern: [bool]  # True: up   a 5th, False: down a 4th
+    flats_pattern:  [bool]  # True: down a 5th, False: up   a 4th
+    # The results of all_notes, indexed by (low ledger, high ledger) positions
+    all_notes_cache: dict[tuple[int, int], frozenset[str]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    # The results of possible_starts, indexed by (low ledger, high ledger)
+    # positions and the name of the type of scale
+    possible_starts_cache: dict[tuple[int, int, str], tuple[str, ...]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    
+    def all_notes(self, world: World) -> frozenset:
+        """
+            Creates a set of all possible starting notes from lowest_note
+            The set is only made once for each number of ledger lines, and
+                stored in all_notes_cache.
+            
+            Args:
+                world (World): The world from which to get settings
+            
+            Returns:
+                frozenset: The set of all possible starting notes for this clef,
+                    given the number of ledger lines as defined in
+                    `world.settings`
+        """
+        ledger_positions = (world.settings.max_low_ledger_positions,
+                            world.settings.max_high_ledger_positions)
+        if ledger_positions in self.all_notes_cache:
+            return self.all_notes_cache[ledger_positions]
+        
+        all_notes = []
+        letter_now = self.lowest_note.letter
+        octave_now = self.lowest_note.octave
+        for i in range(TOTAL_NOTES - LETTERS_PER_OCTAVE):
+            temp_notes = [letter_now] * 3
+            temp_notes[0] += FLAT
+            temp_notes[2] += SHARP
+            temp_notes = [f"{note}{octave_now}" for note in temp_notes]
+            all_notes += temp_notes
+            
+            letter_now = get_next_letter(letter_now)
+            if letter_now == "C":
+                octave_now += 1
+                
+        low, high = ledger_positions
+        self.all_notes_cache[ledger_positions] = frozenset(
+            all_notes[
+                3 * (LEDGER_LINES - low):
+                len(all_notes) - 3 * (LEDGER_LINES - high)
+            ]
+        )
+        return self.all_notes_cache[ledger_positions]
+    
+    def possible_starts(self, scale_type: ScaleInfo, world: World) -> tuple:
+        """
+            Finds the notes that a scale of type `scale_type` can start on in
+                this clef.  Like all_notes, this is only worked out once for
+                each number of ledger lines, and stored in
+                possible_starts_cache.
+            
+            Args:
+                scale_type (ScaleInfo): The type of scale
+                world (World): The world from which to get settings
+            
+            Returns:
+                tuple: The notes that the scale can start on, as a tuple so that
+                    one can be picked without making a list first
+        """
+        key = (world.settings.max_low_ledger_positions,
+               world.settings.max_high_ledger_positions,
+               scale_type.name)
+        if key not in self.possible_starts_cache:
+            self.possible_starts_cache[key] = tuple(
+                scale_type.possible_starts & self.all_notes(world)
+            )
+        return self.possible_starts_cache[key]
 
 
 CLEFS = {
@@ -416,12 +525,25 @@ CLEFS = {
 
 CLEF_SYMBOLS_NAMES = {clef.symbol: name for name, clef in CLEFS.items()}
 
+# The font_offset_number of every letter and octave in every clef, indexed by
+# (clef name, letter, octave)
+FONT_OFFSET_NUMBERS = {
+    (clef.name, letter, octave):
+        Note(f"{letter}{octave}").calculate_font_offset_number(clef)
+    for clef in CLEFS.values()
+    for letter in "ABCDEFG"
+    for octave in range(10)
+}
+
 
 class Scale:
-    pattern: [int]
+    __slots__ = ('pattern', 'starts_on', 'clef', 'key_signature',
+                 'sheet_music', 'background', 'display', 'blur')
+    pattern: bytes  # The number of half steps in each step of the scale
     starts_on: Note
     clef: Clef
     key_signature: KeySignature
+    sheet_music: str
     background: DesignerObject
     display: DesignerObject
     blur: DesignerObject
@@ -443,37 +565,31 @@ class Scale:
             clef (str): The name of the clef
         """
         if scale_type is None:
-            possible_scale_types = (
-                set(world.settings.scale_types)
-                & set(SCALE_TYPE_KEYS)
-            )
-            scale_name = SCALE_TYPE_KEYS[choice(possible_scale_types)]
-            scale_type = SCALE_TYPE_INFO[scale_name]
-        
-        pattern = scale_type.pattern
+            possible_scale_types = world.scale_type_choices
+            scale_type = possible_scale_types[
+                randrange(len(possible_scale_types))
+            ]
         
         if clef is None:
-            possible_clefs = (
-                set(world.settings.clefs)
-                & set(CLEFS)
-            )
-            clef = choice(possible_clefs)
+            possible_clefs = world.clef_choices
+            clef = possible_clefs[randrange(len(possible_clefs))]
         
         if starts_on is None:
-            possible_starts = (
-                scale_type.possible_starts
-                & CLEFS[clef].all_notes(world)
-            )
-            starts_on = choice(possible_starts)
+            possible_starts = CLEFS[clef].possible_starts(scale_type, world)
+            starts_on = possible_starts[randrange(len(possible_starts))]
         
-        int_p = [int_from_pattern(c) for c in pattern]
+        int_p = scale_type.pattern_ints
         if ensure_octave(int_p):
             self.pattern = int_p
         else:
-            raise Exception(f"InvalidScaleSizeError: {pattern}")
+            raise Exception(f"InvalidScaleSizeError: {scale_type.pattern}")
         
-        self.starts_on = Note(starts_on)
+        if starts_on in scale_type.start_notes:
+            self.starts_on = scale_type.start_notes[starts_on]
+        else:
+            self.starts_on = Note(starts_on)
         self.clef = CLEFS[clef]
+        self.sheet_music = self.make_sheet_music()
         self.background = rectangle('white',
                                     BACKGROUND_WIDTH, BACKGROUND_HEIGHT)
         self.display = text(
@@ -489,12 +605,7 @@ class Scale:
         Returns:
             str: The sheet music scale
         """
-        this_note = self.starts_on
-        disp_text = self.clef.symbol
-        for up_by in self.pattern + [2]:  # The 2 is just so it runs again
-            disp_text += this_note.string_form(self.clef)
-            this_note = this_note.up_by(up_by, len(self.pattern))
-        return disp_text
+        return self.sheet_music
     
     def __repr__(self) -> str:
         """
@@ -508,7 +619,23 @@ class Scale:
         for up_by in self.pattern:
             disp_text += " "
             this_note = this_note.up_by(up_by, len(self.pattern))
-            disp_text += repr(this_note)
+            disp_text += this_note.string_form()
+        return disp_text
+    
+    def make_sheet_music(self) -> str:
+        """
+        Builds the sheet music for the scale in Game Font.  A Scale never
+            changes once it's made, so this is only run by the constructor, and
+            __str__ just returns the result.
+
+        Returns:
+            str: The sheet music scale
+        """
+        this_note = self.starts_on
+        disp_text = self.clef.symbol
+        for up_by in self.pattern + b"\2":  # The 2 is just so it runs again
+            disp_text += this_note.string_form(self.clef)
+            this_note = this_note.up_by(up_by, len(self.pattern))
         return disp_text
     
     def make_text(self, x: int, y: int):
@@ -526,7 +653,7 @@ class Scale:
         
         self.display.x = x
         self.display.y = y
-        self.display.text = str(self)
+        self.display.text = self.sheet_music
         
         self.blur.x = self.background.x
         self.blur.y = self.background.y
@@ -1,8 +1,10 @@
 import json
+import os
+from copy import deepcopy
 from designer import *
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, fields, field
 from useful import Menu, MenuEntry, GAME_FONT_PATH, pm_bool, GAME_FONT_NAME, \
-    make_scale_keys_text, TEXT_FONT_NAME, ignore_numpad
+    make_scale_keys_text, TEXT_FONT_NAME, ignore_numpad, DEBUG_KEYS
 from scale import TOTAL_NOTES, LEDGER_LINES, NOTES_START, LETTERS_PER_OCTAVE, \
     NORMAL_SCALE_NAMES, SCALE_TYPE_INFO, NORMAL_SCALE_KEYS, \
     CHURCH_MODES_NAMES, CHURCH_MODES_KEYS, CLEFS, CLEF_SYMBOLS_NAMES
@@ -17,18 +19,42 @@ DEFAULT_CONFIG = {
     "max_low_ledger_positions": 4,
 }
 
+# The Settings last loaded from or saved to .config.json, and the modification
+# time of the file when they were, so it's only read again if it has changed
+_cached_settings = None
+_cached_mtime = None
+
+
+def config_mtime() -> int | None:
+    """
+    Gets the modification time of .config.json.
+    
+    Returns:
+        int | None: The modification time in nanoseconds, or None if there is
+            no .config.json
+    """
+    try:
+        return os.stat(".config.json").st_mtime_ns
+    except FileNotFoundError:
+        return None
+
 
 @dataclass(kw_only=True)
 class Settings(object):
-    scale_types: [str]
-    clefs: [str]
+    scale_types: set[str]
+    clefs: set[str]
     max_sharps_key_signature: int
     max_flats_key_signature: int
     max_high_ledger_positions: int
     max_low_ledger_positions: int
     
     def __post_init__(self):
-        """ Causes self.validate() to be called after initialisation """
+        """
+        Converts the scale types and clefs (lists in .config.json) to sets, and
+            causes self.validate() to be called after initialisation
+        """
+        self.scale_types = set(self.scale_types)
+        self.clefs = set(self.clefs)
         self.validate()
     
     @classmethod
@@ -36,23 +62,44 @@ class Settings(object):
         """
         Returns a Settings object from the settings stored in .config.json, or
             if the config isn't found, uses the default settings.
+        The file is only read again if it has changed since it was last loaded
+            or saved; otherwise a copy of the cached Settings is returned.
         """
-        try:
-            with open(".config.json") as f:
-                config_string = f.read()
-                config = json.loads(config_string)
-        except FileNotFoundError:
-            config = DEFAULT_CONFIG
+        global _cached_settings, _cached_mtime
+        mtime = config_mtime()
+        if _cached_settings is None or mtime != _cached_mtime:
+            try:
+                with open(".config.json") as f:
+                    config_string = f.read()
+                    config = json.loads(config_string)
+            except FileNotFoundError:
+                config = DEFAULT_CONFIG
+            _cached_settings = Settings(**deepcopy(config))
+            _cached_mtime = mtime
         
-        self = Settings(**config)
+        self = deepcopy(_cached_settings)
         return self
     
     def save(self):
         """ Saves this Settings object as JSON data to .config.json """
-        config = asdict(self)
+        global _cached_settings, _cached_mtime
+        # JSON has no sets, so these are saved as (sorted) lists
+        config = {}
+        for field_ in fields(self):
+            value = getattr(self, field_.name)
+            config[field_.name] = (
+                sorted(value) if isinstance(value, set) else value
+            )
         config_string = json.dumps(config, indent=2)
-        with open(".config.json", "w") as f:
-            f.write(config_string)
+        # Written to a temporary file first, and then moved over .config.json,
+        # so a crash part way through can't leave it half written
+        with open(".config.json.tmp", "wb") as f:
+            f.write(config_string.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(".config.json.tmp", ".config.json")
+        _cached_settings = Settings(**config)
+        _cached_mtime = config_mtime()
     
     def validate(self):
         """
@@ -70,7 +117,7 @@ class Settings(object):
             listed in .config.json
         """
         if not self.scale_types:
-            self.scale_types = DEFAULT_CONFIG["scale_types"]
+            self.scale_types = set(DEFAULT_CONFIG["scale_types"])
     
     def validate_clefs(self):
         """
@@ -78,24 +125,19 @@ class Settings(object):
             in .config.json
         """
         if not self.clefs:
-            self.clefs = DEFAULT_CONFIG["clefs"]
+            self.clefs = set(DEFAULT_CONFIG["clefs"])
     
     def validate_key_signatures(self):
         """
         Handles the validation of the key signatures, though functionality
             needing them hasn't been implemented.
         """
-        self.max_sharps_key_signature = min(
-            self.max_sharps_key_signature, LETTERS_PER_OCTAVE
-        )
-        self.max_flats_key_signature = min(
-            self.max_flats_key_signature, LETTERS_PER_OCTAVE
-        )
+        max_key_signature = LETTERS_PER_OCTAVE
         self.max_sharps_key_signature = max(
-            self.max_sharps_key_signature, 0
+            0, min(self.max_sharps_key_signature, max_key_signature)
         )
         self.max_flats_key_signature = max(
-            self.max_flats_key_signature, 0
+            0, min(self.max_flats_key_signature, max_key_signature)
         )
     
     def validate_ledger_lines(self):
@@ -103,17 +145,12 @@ class Settings(object):
         Handles the validation of the ledger lines: uses the closest viable
             count if the values stored in .config.json are out of range.
         """
-        self.max_low_ledger_positions = min(
-            self.max_low_ledger_positions, LEDGER_LINES
-        )
-        self.max_high_ledger_positions = min(
-            self.max_high_ledger_positions, LEDGER_LINES
-        )
+        ledger_lines = LEDGER_LINES
         self.max_low_ledger_positions = max(
-            self.max_low_ledger_positions, 0
+            0, min(self.max_low_ledger_positions, ledger_lines)
         )
         self.max_high_ledger_positions = max(
-            self.max_high_ledger_positions, 0
+            0, min(self.max_high_ledger_positions, ledger_lines)
         )
 
 
@@ -126,10 +163,12 @@ class SettingsScreen(Menu):
     header: str = "Settings: Press a number key to continue or "\
                   "Esc to exit the menu or submenu"
     entries: [MenuEntry] = field(default_factory=list)
-    settings: Settings = field(default_factory=Settings.load)
+    _settings: Settings | None = None  # Loaded by `settings` when first used
     active_sub_menu: str = ""
     active_sub_menu_left: bool = True
     sub_menu: list[Text] | Menu | None = None
+    # The texts in the scale types sub menus, indexed by scale type name
+    scale_type_texts: dict[str, Text] = field(default_factory=dict)
     
     def __post_init__(self):
         """
@@ -144,6 +183,19 @@ class SettingsScreen(Menu):
             MenuEntry("Increase/Decrease Ledger Lines", self.ledger_lines)
         ]
         super().__post_init__()
+    
+    @property
+    def settings(self) -> Settings:
+        """
+        The settings being changed.  These aren't loaded until they're first
+            needed, so just opening the menu doesn't read .config.json.
+        
+        Returns:
+            Settings: The settings
+        """
+        if self._settings is None:
+            self._settings = Settings.load()
+        return self._settings
 
     def standard_scales(self):
         """
@@ -151,31 +203,47 @@ class SettingsScreen(Menu):
         """
         if self.active_sub_menu != "standard scales":
             self.active_sub_menu = "standard scales"
-            self.sub_menu = [
-                text('black', "Type a key to Enable/Disable a scale type", 24,
-                     font_name=TEXT_FONT_NAME)
-            ]
-            self.sub_menu += make_scale_keys_text(NORMAL_SCALE_NAMES)
-        for scale_type_text in self.sub_menu[1:]:
-            if scale_type_text.text[3:] in self.settings.scale_types:
-                scale_type_text.alpha = ACTIVE
-            else:
-                scale_type_text.alpha = INACTIVE
+            self.make_scale_types_sub_menu(NORMAL_SCALE_NAMES)
     
     def church_modes(self):
         """ Handles the settings to enable and disable the church modes. """
         if self.active_sub_menu != "church modes":
             self.active_sub_menu = "church modes"
-            self.sub_menu = [
-                text('black', "Type a key to Enable/Disable a scale type", 24,
-                     font_name=TEXT_FONT_NAME)
-            ]
-            self.sub_menu += make_scale_keys_text(CHURCH_MODES_NAMES)
-        for scale_type_text in self.sub_menu[1:]:
-            if scale_type_text.text[3:] in self.settings.scale_types:
+            self.make_scale_types_sub_menu(CHURCH_MODES_NAMES)
+    
+    def make_scale_types_sub_menu(self, scale_names: [str]):
+        """
+        Creates the sub menu to enable and disable the given scale types, with
+            each one greyed out or not depending on whether it's enabled.
+        
+        Args:
+            scale_names (list[str]): The names of the scale types in the menu
+        """
+        self.sub_menu = [
+            text('black', "Type a key to Enable/Disable a scale type", 24,
+                 font_name=TEXT_FONT_NAME)
+        ]
+        scale_type_texts = make_scale_keys_text(scale_names)
+        self.sub_menu += scale_type_texts
+        self.scale_type_texts = dict(zip(scale_names, scale_type_texts))
+        for scale_name, scale_type_text in self.scale_type_texts.items():
+            if scale_name in self.settings.scale_types:
                 scale_type_text.alpha = ACTIVE
             else:
                 scale_type_text.alpha = INACTIVE
+    
+    def update_scale_type(self, scale_name: str):
+        """
+        Greys out the scale type in the sub menu, or not, after it's been
+            enabled or disabled.  The others are left as they are.
+        
+        Args:
+            scale_name (str): The name of the scale type that was toggled
+        """
+        if scale_name in self.settings.scale_types:
+            self.scale_type_texts[scale_name].alpha = ACTIVE
+        else:
+            self.scale_type_texts[scale_name].alpha = INACTIVE
 
     def clefs(self):
         """ Handles the settings to enable and disable clefs. """
@@ -188,11 +256,12 @@ class SettingsScreen(Menu):
             self.sub_menu = Menu("Enable/Disable Clefs", clef_entries,
                                  left=True, margin_left=400, margin_top=50,
                                  body_font=(GAME_FONT_NAME, GAME_FONT_PATH))
+        active_clefs = self.settings.clefs
         for text_ in self.sub_menu.menu_text:
-            if CLEF_SYMBOLS_NAMES[text_.text[-1]] in self.settings.clefs:
-                text_.alpha = ACTIVE
-            else:
-                text_.alpha = INACTIVE
+            text_.alpha = (
+                ACTIVE if CLEF_SYMBOLS_NAMES[text_.text[-1]] in active_clefs
+                else INACTIVE
+            )
 
     def toggle_clef(self, clef_name: str):
         """
@@ -201,10 +270,7 @@ class SettingsScreen(Menu):
         Args:
             clef_name (str): The name of the clef to enable or disable
         """
-        if clef_name in self.settings.clefs:
-            self.settings.clefs.remove(clef_name)
-        else:
-            self.settings.clefs.append(clef_name)
+        self.settings.clefs ^= {clef_name}
         self.clefs()
 
     def ledger_lines(self):
@@ -251,6 +317,7 @@ class SettingsScreen(Menu):
             for designer_object in self.sub_menu:
                 destroy(designer_object)
         self.sub_menu = None
+        self.scale_type_texts = {}
 
 
 def void_setup():
@@ -258,54 +325,105 @@ def void_setup():
     return SettingsScreen(left=True, size_percent=70, margin_left=20)
 
 
+def ledger_lines_keyPressed(menu: SettingsScreen, key: str):
+    """
+    Handles keypresses in the ledger lines sub menu.
+    
+    Args:
+        menu (SettingsScreen): The settings menu
+        key (str): The key that was pressed, ignoring the number pad
+    """
+    change = 0
+    match key:
+        case 'left' | 'right':
+            menu.active_sub_menu_left ^= True  # not
+        case 'up' | 'down':
+            change = pm_bool(key == 'down')
+        case 'escape':
+            menu.exit_sub_menu()
+            return
+    if menu.active_sub_menu_left:
+        menu.settings.max_low_ledger_positions  += change
+    else:
+        menu.settings.max_high_ledger_positions -= change
+    menu.ledger_lines()
+
+
+def toggle_scale_type(menu: SettingsScreen, key: str, scale_keys: [str]):
+    """
+    Handles keypresses in the scale types sub menus, enabling or disabling the
+        scale type for the key pressed, if it's in this sub menu.
+    
+    Args:
+        menu (SettingsScreen): The settings menu
+        key (str): The key that was pressed, ignoring the number pad
+        scale_keys (list[str]): The keys of the scale types in this sub menu
+    """
+    if key == 'escape':
+        menu.exit_sub_menu()
+    if key not in scale_keys:
+        return
+    scale_name = SCALE_TYPE_INFO[key].name
+    menu.settings.scale_types ^= {scale_name}
+    menu.update_scale_type(scale_name)
+
+
+def standard_scales_keyPressed(menu: SettingsScreen, key: str):
+    """ Handles keypresses in the standard scales sub menu. """
+    toggle_scale_type(menu, key, NORMAL_SCALE_KEYS)
+
+
+def church_modes_keyPressed(menu: SettingsScreen, key: str):
+    """ Handles keypresses in the church modes sub menu. """
+    toggle_scale_type(menu, key, CHURCH_MODES_KEYS)
+
+
+def clefs_keyPressed(menu: SettingsScreen, key: str):
+    """
+    Handles keypresses in the clefs sub menu.
+    
+    Args:
+        menu (SettingsScreen): The settings menu
+        key (str): The key that was pressed, ignoring the number pad
+    """
+    if not menu.sub_menu.select(key):
+        if key == "escape":
+            menu.exit_sub_menu()
+
+
+def settings_keyPressed(menu: SettingsScreen, key: str):
+    """
+    Handles keypresses in the main settings menu, i.e. when no sub menu is
+        open.
+    
+    Args:
+        menu (SettingsScreen): The settings menu
+        key (str): The key that was pressed, ignoring the number pad
+    """
+    if not menu.select(key):
+        match key:
+            case "escape":
+                menu.settings.save()
+                pop_scene()
+            case _ if DEBUG_KEYS:
+                print(key)
+
+
+# The keypress handlers for each sub menu, indexed by active_sub_menu
+SUB_MENU_KEY_HANDLERS = {
+    "ledger lines": ledger_lines_keyPressed,
+    "standard scales": standard_scales_keyPressed,
+    "church modes": church_modes_keyPressed,
+    "clefs": clefs_keyPressed,
+}
+
+
 def void_keyPressed(menu: SettingsScreen, key: str):
     """ See world.void_keyPressed for explanation """
     key = ignore_numpad(key)
-    match menu.active_sub_menu:
-        case "ledger lines":
-            change = 0
-            match key:
-                case 'left' | 'right':
-                    menu.active_sub_menu_left ^= True  # not
-                case 'up' | 'down':
-                    change = pm_bool(key == 'down')
-                case 'escape':
-                    menu.exit_sub_menu()
-                    return
-            if menu.active_sub_menu_left:
-                menu.settings.max_low_ledger_positions  += change
-            else:
-                menu.settings.max_high_ledger_positions -= change
-            menu.ledger_lines()
-        case "standard scales" | "church modes":
-            if key == 'escape':
-                menu.exit_sub_menu()
-            scale_keys, scale_names, scales = (
-                (NORMAL_SCALE_KEYS, NORMAL_SCALE_NAMES, menu.standard_scales)
-                if menu.active_sub_menu == "standard scales"
-                else (CHURCH_MODES_KEYS, CHURCH_MODES_NAMES, menu.church_modes)
-            )
-            if key not in scale_keys:
-                return
-            scale_name = SCALE_TYPE_INFO[key].name
-            if scale_name in scale_names:
-                if scale_name in menu.settings.scale_types:
-                    menu.settings.scale_types.remove(scale_name)
-                else:
-                    menu.settings.scale_types.append(scale_name)
-            scales()
-        case "clefs":
-            if not menu.sub_menu.select(key):
-                if key == "escape":
-                    menu.exit_sub_menu()
-        case _:
-            if not menu.select(key):
-                match key:
-                    case "escape":
-                        menu.settings.save()
-                        pop_scene()
-                    case _:
-                        print(key)
+    handler = SUB_MENU_KEY_HANDLERS.get(menu.active_sub_menu,
+                                        settings_keyPressed)
+    handler(menu, key)
 
 
 def whens():
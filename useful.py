@@ -1,8 +1,8 @@
 from typing import Union, Any
-from collections.abc import Iterable, Callable
+from collections.abc import Callable
 from dataclasses import dataclass
+from functools import lru_cache
 from designer import *
-import random
 
 
 def pm_bool(b: bool) -> int:
@@ -19,6 +19,14 @@ def pm_bool(b: bool) -> int:
     return b * 2 - 1
 
 
+# The number of half steps for each character of a scale pattern
+PATTERN_VALUES = {
+    'H': 1,
+    'W': 2,
+    '3': 3,
+}
+
+
 def int_from_pattern(pattern_char: str) -> int:
     """
     Takes in a char from a scale pattern and returns an integer that's more
@@ -28,25 +36,18 @@ def int_from_pattern(pattern_char: str) -> int:
         pattern_char (str): The single character to convert
 
     Returns:
-        int: The converted value
+        int: The converted value, or 0 if it isn't in PATTERN_VALUES
     """
-    match pattern_char:
-        case 'H':
-            return 1
-        case 'W':
-            return 2
-        case '3':
-            return 3
-        case _:
-            return 0
-
-
-def ensure_octave(pattern: [int]) -> bool:
+    return PATTERN_VALUES.get(pattern_char, 0)
+
+
+def ensure_octave(pattern: Union[bytes, list[int]]) -> bool:
     """
     Ensures that the input scale pattern fits exactly in an octave.
     
     Args:
-        pattern (list[int]): The scale pattern to evaluate.
+        pattern (bytes or list[int]): The scale pattern to evaluate, as the
+            number of half steps in each step.
 
     Returns:
         bool: Whether it's a valid scale.
@@ -77,6 +78,21 @@ def cmp(a, b) -> int:
     return (a > b) - (a < b)
 
 
+@lru_cache(maxsize=32)
+def parse_version(version: str) -> tuple[int, ...]:
+    """
+    Converts a version string to a tuple that can be compared with others.
+        Results are cached, as the same versions are checked over and over.
+    
+    Args:
+        version (str): The version, e.g. "0.6.3"
+
+    Returns:
+        tuple[int, ...]: The numbers in the version, e.g. (0, 6, 3)
+    """
+    return tuple(map(int, (version.split("."))))
+
+
 def ensure_version(actual: str, required: str) -> bool:
     """
     Tests if the version of a program/module is high enough.
@@ -88,11 +104,7 @@ def ensure_version(actual: str, required: str) -> bool:
     Returns:
         bool: Whether the program/module is new enough
     """
-    return (
-            tuple(map(int, (actual.split("."))))
-            >=
-            tuple(map(int, (required.split("."))))
-    )
+    return parse_version(actual) >= parse_version(required)
 
 
 def boulder_speed(score: float, base_speed: int) -> float:
@@ -113,37 +125,15 @@ def boulder_speed(score: float, base_speed: int) -> float:
     return base_speed * (1 + ((score - 1) / 30) ** .9)
 
 
-@dataclass
-class MatchIter:
-    value: Iterable
-    
-
-class MatchStr(str):
-    def __eq__(self, match_list: Union[Iterable, str]) -> bool:
-        """
-        Checks if the value of the MatchStr is in the list, or if it is equal to
-            the string.
-        
-        Args:
-            match_list (Iterable or str): The list or string to check against
-
-        Returns:
-            bool: Whether the value of the MatchStr is in the list or is equal
-                to the string
-        """
-        if isinstance(match_list, str):
-            return match_list.__eq__(self)
-        else:
-            return self in list(match_list)
-
-
 GAME_FONT_PATH = "resources/Game Font.ttf"
 GAME_FONT_NAME = "Game Font"
 TEXT_FONT_NAME = "Times New Roman"
 
+DEBUG_KEYS = False  # Whether to print the keys pressed that do nothing
+
 
-@dataclass
 class MenuEntry:
+    __slots__ = ('label', 'do', 'args', 'kwargs')
     label: str
     do: Callable
     args: [Any]
@@ -151,8 +141,8 @@ class MenuEntry:
     
     def __init__(self, label: str, do: Callable, *args, **kwargs):
         """
-        This function is just here to deal with *args and **kwargs.  If
-            dataclasses could deal with them, it would be unnecessary.
+        Constructor for MenuEntry.  This isn't a dataclass, as dataclasses
+            can't deal with *args and **kwargs.
             
         Args:
             label (str): The text to display for the menu option
@@ -184,7 +174,7 @@ class MenuEntry:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     header: str
     entries: [MenuEntry]
@@ -267,6 +257,10 @@ class Menu:
             destroy(text_)
 
 
+# A translation table that deletes the brackets around number pad keys
+NUMPAD_BRACKETS = str.maketrans('', '', '[]')
+
+
 def ignore_numpad(key: str) -> str:
     """
     Strips brackets indicating a number pad key press
@@ -277,23 +271,30 @@ def ignore_numpad(key: str) -> str:
     Returns:
         str: The key pressed, ignoring if it was on the number pad
     """
-    return str(key).replace("[", "").replace("]", "")
+    return str(key).translate(NUMPAD_BRACKETS)
 
 
-def choice(iterable: Iterable):
+GUTTER = 200  # How far away from the right to put the score and other info
+
+
+@lru_cache(maxsize=None)
+def make_scale_keys_strs(scale_names: tuple[str, ...]) -> tuple[str, ...]:
     """
-    Takes in any iterable, converts it to list and runs choice on that.
+    Makes the lines of the table showing the user what keys to press for which
+        scale type.  These never change, so they're only made once for each
+        group of scale types.
     
     Args:
-        iterable (Iterable): Any Iterable from which to get a random element
-        
+        scale_names (tuple[str, ...]): The names of the scale types
+
     Returns:
-        A random element of iterable
+        tuple[str, ...]: The lines of the table
     """
-    return random.choice(list(iterable))
-    
-
-GUTTER = 200  # How far away from the right to put the score and other info
+    from scale import SCALE_TYPE_KEYS
+    return tuple(
+        f"{SCALE_TYPE_KEYS[scale_type_name]}: {scale_type_name}"
+        for scale_type_name in scale_names
+    )
 
 
 def make_scale_keys_text(scale_names: [str]) -> [DesignerObject]:
@@ -307,16 +308,13 @@ def make_scale_keys_text(scale_names: [str]) -> [DesignerObject]:
         list[DesignerObject]: A list of DesignerObjects displaying which keys to
             press for which scale type.
     """
-    from scale import SCALE_TYPE_KEYS
-    scale_keys_strs = [
-        f"{SCALE_TYPE_KEYS[scale_type_name]}: {scale_type_name}"
-        for scale_type_name in scale_names
-    ]
+    scale_keys_strs = make_scale_keys_strs(tuple(scale_names))
+    x = get_width() - GUTTER
     scale_keys_text = []
     for i, scale_keys_str in enumerate(scale_keys_strs):
         scale_keys_text.append(
             text('black', scale_keys_str, 20,
-                 get_width() - GUTTER, 80 + 40 * i, anchor="midleft",
+                 x, 80 + 40 * i, anchor="midleft",
                  font_name=TEXT_FONT_NAME)
         )
     return scale_keys_text
@@ -1,29 +1,34 @@
 from designer import *
 from random import random as rand
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from boulder import Boulder
 from settings import Settings
-from useful import pm_bool, int_from_pattern, MatchStr, MatchIter, \
-    GAME_FONT_PATH, GAME_FONT_NAME, make_scale_keys_text, GUTTER
-from scale import SCALE_TYPE_INFO, SCALE_TYPE_KEYS
+from useful import GAME_FONT_PATH, GAME_FONT_NAME, make_scale_keys_text, \
+    GUTTER, DEBUG_KEYS
+from scale import SCALE_TYPE_INFO, SCALE_TYPE_KEYS, CLEFS, ScaleInfo
 
 FAILED_BOULDER_PENALTY = -5
 
 BOULDER_MAX_PROB = 2 ** -6
 MAX_BOULDERS = 4
 
-SCALE_KEYS = MatchIter(SCALE_TYPE_INFO)
-
 
 @dataclass
 class World:
     text_score: DesignerObject = None
+    # The score text and window width that text_score was last laid out for
+    displayed_score: tuple[str, int] = ("", 0)
     scale_keys_text: [DesignerObject] = None
     boulders: dict[int, Boulder] = field(default_factory=dict)
+    sorted_keys: [int] = field(default_factory=list)  # Keys of boulders, sorted
     score: float = 0.
     selected: int = 0  # The key of the selected boulder, its x-coordinate
     paused: bool = False
     settings: Settings = None
+    # The types of scale and names of clefs enabled in settings, to pick from
+    scale_type_choices: tuple[ScaleInfo, ...] = ()
+    clef_choices: tuple[str, ...] = ()
     
     def __post_init__(self):
         """
@@ -34,6 +39,12 @@ class World:
             Initialises the world with no boulders and a score of 0.
         """
         self.settings = Settings.load()
+        self.scale_type_choices = tuple(
+            SCALE_TYPE_INFO[SCALE_TYPE_KEYS[scale_name]]
+            for scale_name in
+            self.settings.scale_types & SCALE_TYPE_KEYS.keys()
+        )
+        self.clef_choices = tuple(self.settings.clefs & CLEFS.keys())
         
         self.text_score = text(
             'black', f"{self.score:.4}", 30,
@@ -52,12 +63,21 @@ class World:
         for boulder in self.boulders.values():
             boulder.move_down(self)
     
-    def display_score(self):
+    def display_score(self, width: int):
         """
-        Displays the score off to the side of the screen.  Run each frame
+        Displays the score off to the side of the screen.  Run each frame, but
+            the text is only re-rendered when the score or window width changes
+        
+        Args:
+            width (int): The width of the window, as found at the start of the
+                frame
         """
-        self.text_score.text = f"{self.score:.4}"
-        self.text_score.x = get_width() - (GUTTER - self.text_score.width//2)
+        score_str = f"{self.score:.4}"
+        if (score_str, width) == self.displayed_score:
+            return
+        self.displayed_score = (score_str, width)
+        self.text_score.text = score_str
+        self.text_score.x = width - (GUTTER - self.text_score.width//2)
     
     def sorted_onscreen_boulder_keys(self) -> [int]:
         """
@@ -67,12 +87,10 @@ class World:
         Returns:
             list[int]: A sorted list of useful boulder keys
         """
-        keys = sorted(list(self.boulders.keys()))
-        good_keys = []
-        for key in keys:
-            if self.boulders[key].boulder.y > 0:
-                good_keys.append(key)
-        return good_keys
+        return [
+            key for key in self.sorted_keys
+            if self.boulders[key].boulder.y > 0
+        ]
     
     def key_of_max_y_boulder(self) -> int:
         """
@@ -82,11 +100,7 @@ class World:
         Returns:
             int: The key of said boulder.
         """
-        boulders = list(self.boulders.values())
-        max_y = boulders[0]
-        for boulder in boulders:
-            if boulder.boulder.y > max_y.boulder.y:
-                max_y = boulder
+        max_y = max(self.boulders.values(), key=lambda b: b.boulder.y)
         return max_y.boulder.x
     
     def select(self, right: bool):
@@ -105,19 +119,29 @@ class World:
         
         good_sorted_keys = self.sorted_onscreen_boulder_keys()
         if not good_sorted_keys:
-            self.selected = self.key_of_max_y_boulder()
+            self.highlight(self.key_of_max_y_boulder())
             return
         
+        # Both wrap around: past the right end to the leftmost and vice versa
         if right:
-            good_sorted_keys = list(reversed(good_sorted_keys))
-        new_selected = good_sorted_keys[-1]
-        for key in good_sorted_keys:
-            self.boulders[key].boulder.alpha = .5
-            if pm_bool(right)*key > self.selected*pm_bool(right):
-                new_selected = key
+            i = bisect_right(good_sorted_keys, self.selected)
+            i %= len(good_sorted_keys)
+        else:
+            i = bisect_left(good_sorted_keys, self.selected) - 1
+        self.highlight(good_sorted_keys[i])
+    
+    def highlight(self, key: int):
+        """
+        Makes the boulder at `key` the selected one, and dims the one that was
+            selected before it, if it still exists.
         
-        self.selected = new_selected
-        self.boulders[self.selected].boulder.alpha = 1
+        Args:
+            key (int): The key of the boulder to select
+        """
+        if self.selected in self.boulders:
+            self.boulders[self.selected].boulder.alpha = .5
+        self.selected = key
+        self.boulders[key].boulder.alpha = 1
     
     def select_previous(self):
         """
@@ -152,15 +176,22 @@ class World:
         """
         self.score += amount
     
-    def remove_fallen_boulders(self):
+    def remove_fallen_boulders(self, height: int):
         """
         Removes any boulders that have fallen below the bottom of the window and
             decreases the score by FAILED_BOULDER_PENALTY.
+        
+        Args:
+            height (int): The height of the window, as found at the start of the
+                frame
         """
-        for boulder in list(self.boulders.values()):
-            if boulder.boulder.y > get_height():
-                boulder.remove(self)
-                self.update_score(FAILED_BOULDER_PENALTY)
+        fallen = [
+            key for key, boulder in self.boulders.items()
+            if boulder.boulder.y > height
+        ]
+        for key in fallen:
+            self.boulders[key].remove(self)
+            self.update_score(FAILED_BOULDER_PENALTY)
     
     def pause(self):
         """
@@ -172,6 +203,50 @@ class World:
             set_visible(boulder.scale.blur, not self.paused)
         self.paused = not self.paused
     
+    def guess(self, key: str):
+        """
+        Checks the player's guess of the type of the selected boulder's scale.
+            If it's right, the boulder is removed and its value is added to the
+            score, otherwise the boulder's value is halved.
+        
+        Args:
+            key (str): The key of the type of scale guessed, as in
+                SCALE_TYPE_INFO
+        """
+        if self.selected == 0:
+            return
+        selected_boulder = self.boulders[self.selected]
+        sb_pattern = selected_boulder.scale.pattern
+        guessed_pattern = SCALE_TYPE_INFO[key].pattern_ints
+        if sb_pattern == guessed_pattern:
+            self.score += selected_boulder.value
+            selected_boulder.remove(self)
+        else:
+            selected_boulder.value *= 0.50
+
+
+def leave(world: World):
+    """
+    Returns to the main menu, giving the final score.
+    
+    Args:
+        world (World): The world for the game
+    """
+    print(world.score)
+    pop_scene()
+
+
+# What to do when keys other than the scale keys are pressed, for those that
+# only work while the game isn't paused, and those that work either way
+PLAYING_KEY_HANDLERS = {
+    'left': World.select_previous,
+    'right': World.select_next,
+}
+KEY_HANDLERS = {
+    'escape': leave,
+    'space': World.pause,
+}
+
 
 def void_setup() -> World:
     """
@@ -202,6 +277,7 @@ def void_draw(world: World):
     """
     if world.paused:
         return
+    width, height = get_width(), get_height()
     boulder_prob = .1 + .9 / (1 + 2.7**( 2 - world.score/25) )
     boulder_prob *= BOULDER_MAX_PROB
     if len(world.boulders) == 0:
@@ -210,8 +286,8 @@ def void_draw(world: World):
         # print(boulder_prob)
         Boulder(world)
     world.move_boulders_down()
-    world.remove_fallen_boulders()
-    world.display_score()
+    world.remove_fallen_boulders(height)
+    world.display_score(width)
 
 
 def void_keyPressed(world: World, key: str):
@@ -227,32 +303,18 @@ def void_keyPressed(world: World, key: str):
             functions called by this one.
         key (str): The key that was pressed.
     """
-    match MatchStr(str(key)):
-        # if not world.paused:
-        case 'left' if not world.paused:
-            world.select_previous()
-        case 'right' if not world.paused:
-            world.select_next()
-        case SCALE_KEYS.value if not world.paused:
-            if world.selected == 0:
-                return
-            selected_boulder = world.boulders[world.selected]
-            sb_pattern = selected_boulder.scale.pattern
-            guessed_pattern_str = SCALE_TYPE_INFO[key].pattern
-            guessed_pattern = [int_from_pattern(c) for c in guessed_pattern_str]
-            if sb_pattern == guessed_pattern:
-                world.score += selected_boulder.value
-                selected_boulder.remove(world)
-            else:
-                selected_boulder.value *= 0.50
-        # Either way
-        case 'escape':
-            print(world.score)
-            pop_scene()
-        case 'space':
-            world.pause()
-        case _:
-            print(key)
+    key = str(key)
+    if not world.paused:
+        if key in PLAYING_KEY_HANDLERS:
+            PLAYING_KEY_HANDLERS[key](world)
+            return
+        if key in SCALE_TYPE_INFO:
+            world.guess(key)
+            return
+    if key in KEY_HANDLERS:
+        KEY_HANDLERS[key](world)
+    elif DEBUG_KEYS:
+        print(key)
 
 
 def whens():